@@ -1,6 +1,7 @@
-from typing import Literal
-from pydantic import BaseModel, Field
-from openai import OpenAI
+from typing import Any, Literal
+from pydantic import BaseModel, Field, ValidationError
+from openai import AsyncOpenAI
+from openai.lib._pydantic import to_strict_json_schema
 from .ticker import normalize_ticker
 from openai.types.shared_params.reasoning import Reasoning
 
@@ -38,21 +39,16 @@ SENTIMENT RULES:
 4) Negations override: "not bullish", "don't buy", "won't go up" -> bearish; "not bearish" -> bullish
 """.strip()
 
-def analyze_comment(client: OpenAI, *, model: str, text: str) -> list[tuple[str, str]]:
-    if len(text) > 2000:
-        text = text[:2000]
-
-    resp = client.responses.parse(
-        model=model,
-        instructions=SYSTEM_INSTRUCTIONS,
-        input=text,
-        text_format=LineAnalysis,
-        max_output_tokens=1500,
-        reasoning= Reasoning(effort="low")
-    )
+TEXT_FORMAT: dict[str, Any] = {
+    "type": "json_schema",
+    "name": LineAnalysis.__name__,
+    "strict": True,
+    "schema": to_strict_json_schema(LineAnalysis),
+}
 
-    parsed: LineAnalysis = resp.output_parsed
+_parse_line_analysis = LineAnalysis.model_validate_json
 
+def _collect_mentions(parsed: LineAnalysis) -> list[tuple[str, str]]:
     out: dict[str, str] = {}
     for m in parsed.mentions:
         t = normalize_ticker(m.ticker)
@@ -66,3 +62,67 @@ def analyze_comment(client: OpenAI, *, model: str, text: str) -> list[tuple[str,
             out[t] = s
 
     return list(out.items())
+
+async def analyze_comment_async(client: AsyncOpenAI, *, model: str, text: str) -> list[tuple[str, str]]:
+    if len(text) > 2000:
+        text = text[:2000]
+
+    resp = await client.responses.create(
+        model=model,
+        instructions=SYSTEM_INSTRUCTIONS,
+        input=text,
+        text={"format": TEXT_FORMAT},
+        max_output_tokens=1500,
+        reasoning= Reasoning(effort="low")
+    )
+
+    parsed = _parse_line_analysis(resp.output_text)
+    return _collect_mentions(parsed)
+
+def build_batch_request(custom_id: str, *, model: str, text: str) -> dict[str, Any]:
+    if len(text) > 2000:
+        text = text[:2000]
+
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/responses",
+        "body": {
+            "model": model,
+            "instructions": SYSTEM_INSTRUCTIONS,
+            "input": text,
+            "text": {"format": TEXT_FORMAT},
+            "max_output_tokens": 1500,
+            "reasoning": {"effort": "low"},
+        },
+    }
+
+def parse_batch_result(line: dict[str, Any]) -> tuple[str, list[tuple[str, str]] | None, str | None]:
+    custom_id = str(line.get("custom_id") or "")
+
+    err = line.get("error")
+    if err:
+        msg = err.get("message") if isinstance(err, dict) else err
+        return custom_id, None, f"BatchError: {msg}"
+
+    resp = line.get("response") or {}
+    body = resp.get("body") or {}
+    status_code = resp.get("status_code")
+    if status_code != 200:
+        detail = body.get("error") if isinstance(body, dict) else body
+        return custom_id, None, f"HTTP {status_code}: {detail}"
+
+    text = "".join(
+        part.get("text") or ""
+        for item in (body.get("output") or [])
+        if item.get("type") == "message"
+        for part in (item.get("content") or [])
+        if part.get("type") == "output_text"
+    )
+
+    try:
+        parsed = _parse_line_analysis(text)
+    except ValidationError as e:
+        return custom_id, None, f"ValidationError: {e}"
+
+    return custom_id, _collect_mentions(parsed), None
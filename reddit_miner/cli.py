@@ -15,9 +15,9 @@ from rich.text import Text
 
 from .config import RunConfig
 from . import db as dbmod
-from .pipeline import scrape, analyze
+from .pipeline import PENDING_BATCH_KEY_PREFIX, scrape, analyze, analyze_batch
 from .db import fetch_ticker_summary
-from .report import print_report_rich
+from .report import RunSummary, print_report_rich
 from . import ticker as tickermod
 from .credentials import (
     ensure_credentials,
@@ -30,6 +30,11 @@ from .credentials import (
 console = Console()
 _INTRO_SHOWN = False
 _ALT_SCREEN_ON = False
+_STOPPED_REASONS = {
+    "timeout": "Analysis stopped: time limit reached. Results analyzed so far have been saved.",
+    "ctrl_c": "Analysis stopped. Results analyzed so far have been saved.",
+    "quota": "Analysis stopped: OpenAI quota exceeded. Results analyzed so far have been saved.",
+}
 
 def clear_screen() -> None:
     try:
@@ -225,13 +230,13 @@ def _setup_menu() -> None:
         elif choice == "b":
             return
 
-def _choose_config_for_run(*, do_scrape: bool, do_analyze: bool) -> RunConfig | None:
+def _choose_config_for_run(*, do_scrape: bool, do_analyze: bool, use_batch: bool = False) -> RunConfig | None:
     choice = _menu("Run settings:", [("1", "Default"), ("2", "Choose settings"), ("b", "Back")])
     if choice == "b":
         return None
     if choice == "1":
         return RunConfig.defaults()
-    return RunConfig.from_user_input(do_scrape=do_scrape, do_analyze=do_analyze)
+    return RunConfig.from_user_input(do_scrape=do_scrape, do_analyze=do_analyze, use_batch=use_batch)
 
 def _report_flow() -> None:
     cfg = RunConfig.defaults()
@@ -252,13 +257,13 @@ def _report_flow() -> None:
     rows = fetch_ticker_summary(conn, analysis_tag=tag, subreddits=None, limit=500)
     model = dbmod.get_latest_model_for_tag(conn, analysis_tag=tag) or "-"
 
-    summary = {
-        "db_path": cfg.db_path,
-        "subreddits": cfg.subreddits,
-        "listing": cfg.listing,
-        "analysis_tag": tag,
-        "model": model,
-    }
+    summary = RunSummary(
+        db_path=cfg.db_path,
+        subreddits=cfg.subreddits,
+        listing=cfg.listing,
+        analysis_tag=tag,
+        model=model,
+    )
     print_report_rich(summary=summary, rows=rows, top_n=cfg.top_n)
 
     return
@@ -281,15 +286,19 @@ def _pick_tag_for_clear(conn) -> str | None:
     return None
 
 def _clear_analysis(conn, *, analysis_tag: str) -> tuple[int, int]:
+    dbmod.begin_write(conn)
     cur1 = conn.execute("DELETE FROM mentions WHERE analysis_tag = ?", (analysis_tag,))
     cur2 = conn.execute("DELETE FROM comment_analysis WHERE analysis_tag = ?", (analysis_tag,))
+    conn.execute("DELETE FROM app_state WHERE key = ?", (f"{PENDING_BATCH_KEY_PREFIX}{analysis_tag}",))
     conn.commit()
     return cur1.rowcount or 0, cur2.rowcount or 0
 
 def _clear_dataset(conn) -> tuple[int, int, int]:
+    dbmod.begin_write(conn)
     cur1 = conn.execute("DELETE FROM mentions")
     cur2 = conn.execute("DELETE FROM comment_analysis")
     cur3 = conn.execute("DELETE FROM comments")
+    conn.execute("DELETE FROM app_state WHERE key GLOB ?", (f"{PENDING_BATCH_KEY_PREFIX}*",))
     conn.commit()
     return cur1.rowcount or 0, cur2.rowcount or 0, cur3.rowcount or 0
 
@@ -344,6 +353,7 @@ def _run_flow() -> None:
             ("1", "Scrape data"),
             ("2", "Analyze scraped data"),
             ("3", "Scrape then analyze"),
+            ("4", "Analyze scraped data (batch, cheaper)"),
             ("b", "Back"),
         ],
     )
@@ -351,9 +361,10 @@ def _run_flow() -> None:
         return
 
     do_scrape = action in {"1", "3"}
-    do_analyze = action in {"2", "3"}
+    do_analyze = action in {"2", "3", "4"}
+    use_batch = action == "4"
 
-    cfg = _choose_config_for_run(do_scrape=do_scrape, do_analyze=do_analyze)
+    cfg = _choose_config_for_run(do_scrape=do_scrape, do_analyze=do_analyze, use_batch=use_batch)
     if cfg is None:
         return
 
@@ -385,6 +396,7 @@ def _run_flow() -> None:
                 more_limit=cfg.more_limit,
                 max_comments_per_post=cfg.max_comments_per_post,
                 bot_usernames=cfg.bot_usernames,
+                workers=cfg.scrape_workers,
             )
             conn.commit()
         except KeyboardInterrupt:
@@ -413,18 +425,35 @@ def _run_flow() -> None:
             _pause()
             return
 
-    if do_analyze:
-        _print_info("Analysis started. Press Q to stop and save what's been analyzed so far.")
-        try:
-            outcome = analyze(
+    def _analyze_once():
+        if use_batch:
+            return analyze_batch(
                 conn,
                 analysis_tag=cfg.analysis_tag,
                 model=cfg.model,
                 limit=cfg.analysis_limit,
                 retry_errors=False,
-                max_requests_per_minute=cfg.max_requests_per_minute,
                 subreddits=cfg.subreddits,
             )
+        return analyze(
+            conn,
+            analysis_tag=cfg.analysis_tag,
+            model=cfg.model,
+            limit=cfg.analysis_limit,
+            retry_errors=False,
+            max_requests_per_minute=cfg.max_requests_per_minute,
+            subreddits=cfg.subreddits,
+            concurrency=cfg.analyze_concurrency,
+        )
+
+    if do_analyze:
+        if use_batch:
+            _print_info("Batch analysis started. OpenAI can take up to 24h to finish a batch.")
+            _print_info("Press Q to stop waiting; the batch keeps running and its results are collected on the next batch run.")
+        else:
+            _print_info("Analysis started. Press Q to stop and save what's been analyzed so far.")
+        try:
+            outcome = _analyze_once()
             conn.commit()
         except KeyboardInterrupt:
             conn.commit()
@@ -444,15 +473,7 @@ def _run_flow() -> None:
             for attempt in range(3):
                 try:
                     time.sleep(2 ** attempt)
-                    outcome = analyze(
-                        conn,
-                        analysis_tag=cfg.analysis_tag,
-                        model=cfg.model,
-                        limit=cfg.analysis_limit,
-                        retry_errors=False,
-                        max_requests_per_minute=cfg.max_requests_per_minute,
-                        subreddits=cfg.subreddits,
-                    )
+                    outcome = _analyze_once()
                     conn.commit()
                     break
                 except openai.PermissionDeniedError as e2:
@@ -470,20 +491,28 @@ def _run_flow() -> None:
             _pause()
             return
 
+        reason = getattr(outcome, "stopped_reason", None)
+        if reason == "failed":
+            _print_warn(f"Batch failed: {getattr(outcome, 'detail', None) or 'no details returned'}")
+        elif reason:
+            _print_warn(_STOPPED_REASONS.get(reason, f"Batch ended with status: {reason}. Completed results have been saved."))
+            if use_batch and reason in ("timeout", "ctrl_c"):
+                _print_info("The batch is still running on OpenAI; run batch analysis again to collect its results.")
+
         summary_rows = fetch_ticker_summary(conn, analysis_tag=cfg.analysis_tag, subreddits=cfg.subreddits, limit=500)
 
         analyzed_calls = getattr(outcome, "analyzed_model_calls", "-") if outcome is not None else "-"
-        summary = {
-            "db_path": cfg.db_path,
-            "subreddits": cfg.subreddits,
-            "listing": cfg.listing,
-            "post_limit": cfg.post_limit,
-            "max_comments_per_post": cfg.max_comments_per_post,
-            "analysis_tag": cfg.analysis_tag,
-            "model": cfg.model,
-            "saved": saved,
-            "analyzed_model_calls": analyzed_calls,
-        }
+        summary = RunSummary(
+            db_path=cfg.db_path,
+            subreddits=cfg.subreddits,
+            listing=cfg.listing,
+            post_limit=cfg.post_limit,
+            max_comments_per_post=cfg.max_comments_per_post,
+            analysis_tag=cfg.analysis_tag,
+            model=cfg.model,
+            saved=saved,
+            analyzed_model_calls=analyzed_calls,
+        )
         print_report_rich(summary=summary, rows=summary_rows, top_n=cfg.top_n)
 
     elapsed = datetime.timedelta(seconds=int(time.time() - start))
@@ -62,11 +62,13 @@ class RunConfig:
     more_limit: Optional[int]
     max_comments_per_post: int
     bot_usernames: tuple[str, ...] = ("AutoModerator", "VisualMod")
+    scrape_workers: int = defaults.DEFAULT_SCRAPE_WORKERS
 
     analysis_tag: str = defaults.DEFAULT_ANALYSIS_TAG
     analysis_limit: int = defaults.DEFAULT_ANALYSIS_LIMIT
     model: str = defaults.DEFAULT_OPENAI_MODEL
     max_requests_per_minute: int = defaults.DEFAULT_MAX_REQUESTS_PER_MINUTE
+    analyze_concurrency: int = defaults.DEFAULT_ANALYZE_CONCURRENCY
     top_n: int = defaults.DEFAULT_TOP_N
 
     @staticmethod
@@ -78,15 +80,17 @@ class RunConfig:
             post_limit=defaults.DEFAULT_POST_LIMIT,
             more_limit=defaults.DEFAULT_MORE_LIMIT,
             max_comments_per_post=defaults.DEFAULT_MAX_COMMENTS_PER_POST,
+            scrape_workers=defaults.DEFAULT_SCRAPE_WORKERS,
             analysis_tag=defaults.DEFAULT_ANALYSIS_TAG,
             analysis_limit=defaults.DEFAULT_ANALYSIS_LIMIT,
             model=defaults.DEFAULT_OPENAI_MODEL,
             max_requests_per_minute=defaults.DEFAULT_MAX_REQUESTS_PER_MINUTE,
+            analyze_concurrency=defaults.DEFAULT_ANALYZE_CONCURRENCY,
             top_n=defaults.DEFAULT_TOP_N,
         )
 
     @staticmethod
-    def from_user_input(*, do_scrape: bool | None = None, do_analyze: bool | None = None) -> "RunConfig":
+    def from_user_input(*, do_scrape: bool | None = None, do_analyze: bool | None = None, use_batch: bool = False) -> "RunConfig":
         if do_scrape is None or do_analyze is None:
             do_scrape, do_analyze = _choose_mode()
 
@@ -104,11 +108,13 @@ class RunConfig:
         post_limit = defaults.DEFAULT_POST_LIMIT
         max_comments = defaults.DEFAULT_MAX_COMMENTS_PER_POST
         more_limit = defaults.DEFAULT_MORE_LIMIT
+        scrape_workers = defaults.DEFAULT_SCRAPE_WORKERS
 
         analysis_tag = defaults.DEFAULT_ANALYSIS_TAG
         analysis_limit = defaults.DEFAULT_ANALYSIS_LIMIT
         model = defaults.DEFAULT_OPENAI_MODEL
         rpm = defaults.DEFAULT_MAX_REQUESTS_PER_MINUTE
+        concurrency = defaults.DEFAULT_ANALYZE_CONCURRENCY
         top_n = defaults.DEFAULT_TOP_N
 
         if do_scrape:
@@ -120,16 +126,23 @@ class RunConfig:
             post_limit = _prompt_int("Posts per subreddit", defaults.DEFAULT_POST_LIMIT, min_value=1)
             max_comments = _prompt_int("Max comments per post", defaults.DEFAULT_MAX_COMMENTS_PER_POST, min_value=1)
             more_limit = _prompt_optional_int("replace_more limit", defaults.DEFAULT_MORE_LIMIT)
+            scrape_workers = _prompt_int("Posts fetched in parallel", defaults.DEFAULT_SCRAPE_WORKERS, min_value=1)
 
         if do_analyze:
             analysis_tag = _prompt_str("Analysis tag", defaults.DEFAULT_ANALYSIS_TAG)
             analysis_limit = _prompt_int("Max comments to analyze per run", defaults.DEFAULT_ANALYSIS_LIMIT, min_value=1)
             model = _prompt_str("OpenAI model", defaults.DEFAULT_OPENAI_MODEL)
-            rpm = _prompt_int(
-                "Max OpenAI requests per minute (0 disables pacing)",
-                defaults.DEFAULT_MAX_REQUESTS_PER_MINUTE,
-                min_value=0,
-            )
+            if not use_batch:
+                rpm = _prompt_int(
+                    "Max OpenAI requests per minute (0 disables pacing)",
+                    defaults.DEFAULT_MAX_REQUESTS_PER_MINUTE,
+                    min_value=0,
+                )
+                concurrency = _prompt_int(
+                    "Concurrent OpenAI requests",
+                    defaults.DEFAULT_ANALYZE_CONCURRENCY,
+                    min_value=1,
+                )
         return RunConfig(
             db_path=db_path,
             subreddits=subreddits,
@@ -137,9 +150,11 @@ class RunConfig:
             post_limit=post_limit,
             more_limit=more_limit,
             max_comments_per_post=max_comments,
+            scrape_workers=scrape_workers,
             analysis_tag=analysis_tag,
             analysis_limit=analysis_limit,
             model=model,
             max_requests_per_minute=rpm,
+            analyze_concurrency=concurrency,
             top_n=top_n,
         )
@@ -1,17 +1,117 @@
+import queue
 import sqlite3
+import threading
 import time
-from typing import Iterable, Optional
+from typing import Any, Callable, Iterable, Optional
 
 CURRENT_ANALYSIS_TAG_KEY = "current_analysis_tag"
+_DELETE_CHUNK = 900
 
-def connect(db_path: str) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
+def _apply_pragmas(conn: sqlite3.Connection) -> None:
     conn.execute("PRAGMA journal_mode=WAL;")
     conn.execute("PRAGMA synchronous=NORMAL;")
     conn.execute("PRAGMA temp_store=MEMORY;")
-    conn.execute("PRAGMA cache_size=-20000;")
+    conn.execute("PRAGMA cache_size=-131072;")
+    conn.execute("PRAGMA mmap_size=268435456;")
+    conn.execute("PRAGMA busy_timeout=5000;")
+
+def connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    _apply_pragmas(conn)
+    return conn
+
+def _is_locked(err: sqlite3.OperationalError) -> bool:
+    msg = (str(err) or "").lower()
+    return "locked" in msg or "busy" in msg
+
+def begin_write(conn: sqlite3.Connection, *, max_attempts: int = 5) -> None:
+    if conn.in_transaction:
+        return
+    attempt = 0
+    while True:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            return
+        except sqlite3.OperationalError as e:
+            attempt += 1
+            if not _is_locked(e) or attempt >= max_attempts:
+                raise
+            time.sleep(min(0.25 * (2 ** attempt), 5.0))
+
+def open_reader(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    _apply_pragmas(conn)
+    conn.execute("PRAGMA query_only=ON;")
     return conn
 
+def database_path(conn: sqlite3.Connection) -> str:
+    for _seq, name, path in conn.execute("PRAGMA database_list"):
+        if name == "main":
+            return path or ""
+    return ""
+
+class BatchWriter:
+    def __init__(self, conn: sqlite3.Connection, *, max_ops: int = 200, max_delay: float = 0.5):
+        self.conn = conn
+        self.max_ops = max(1, int(max_ops))
+        self.max_delay = max(0.0, float(max_delay))
+        self._queue: queue.Queue[tuple[Callable[..., Any], dict[str, Any]] | None] = queue.Queue()
+        self._error: BaseException | None = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable[..., Any], **kwargs: Any) -> None:
+        if self._error is not None:
+            raise self._error
+        self._queue.put((fn, kwargs))
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _collect(self, first) -> tuple[list, bool]:
+        ops = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(ops) < self.max_ops:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return ops, True
+            ops.append(item)
+        return ops, False
+
+    def _run(self) -> None:
+        conn = self.conn
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            ops, stop = self._collect(item)
+            try:
+                begin_write(conn)
+                for fn, kwargs in ops:
+                    fn(conn, **kwargs)
+                conn.commit()
+            except BaseException as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._error = e
+                return
+
+            if stop:
+                return
+
 def init_db(conn: sqlite3.Connection) -> None:
     conn.execute("""
     CREATE TABLE IF NOT EXISTS comments (
@@ -50,6 +150,14 @@ def init_db(conn: sqlite3.Connection) -> None:
     )
     """)
 
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS ticker_validity (
+        ticker TEXT PRIMARY KEY,
+        valid INTEGER NOT NULL,
+        checked_utc INTEGER NOT NULL
+    )
+    """)
+
     conn.execute("""
     CREATE TABLE IF NOT EXISTS app_state (
         key TEXT PRIMARY KEY,
@@ -60,8 +168,11 @@ def init_db(conn: sqlite3.Connection) -> None:
     conn.execute("CREATE INDEX IF NOT EXISTS idx_comments_subreddit_created ON comments(subreddit, created_utc)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_comments_created ON comments(created_utc)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_comment_analysis_tag_status ON comment_analysis(analysis_tag, status)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_mentions_tag_ticker ON mentions(analysis_tag, ticker)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ticker_validity_checked ON ticker_validity(checked_utc)")
+    conn.execute("DROP INDEX IF EXISTS idx_mentions_tag_ticker")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_mentions_tag_ticker_sentiment ON mentions(analysis_tag, ticker, sentiment, comment_id)")
     conn.commit()
+    conn.execute("PRAGMA optimize;")
 
 def set_app_state(conn: sqlite3.Connection, *, key: str, value: str) -> None:
     conn.execute(
@@ -70,6 +181,10 @@ def set_app_state(conn: sqlite3.Connection, *, key: str, value: str) -> None:
     )
     conn.commit()
 
+def delete_app_state(conn: sqlite3.Connection, *, key: str) -> None:
+    conn.execute("DELETE FROM app_state WHERE key = ?", (key,))
+    conn.commit()
+
 def get_app_state(conn: sqlite3.Connection, *, key: str) -> str | None:
     cur = conn.execute("SELECT value FROM app_state WHERE key = ? LIMIT 1", (key,))
     row = cur.fetchone()
@@ -102,7 +217,7 @@ def save_comment(
     """, (comment_id, subreddit, submission_id, submission_title, author, int(created_utc), int(score), body, now))
 
 def save_comments_bulk(conn: sqlite3.Connection, rows: Iterable[tuple]) -> None:
-    rows_list = list(rows or [])
+    rows_list = rows if isinstance(rows, list) else list(rows or [])
     if not rows_list:
         return
     conn.executemany("""
@@ -131,6 +246,27 @@ def mark_analyzed_error(conn: sqlite3.Connection, *, analysis_tag: str, comment_
     VALUES (?, ?, ?, ?, 'error', ?)
     """, (analysis_tag, comment_id, model, now, error[:2000]))
 
+def mark_analyzed_pending(conn: sqlite3.Connection, *, analysis_tag: str, comment_ids: Iterable[str], model: str) -> None:
+    now = int(time.time())
+    conn.executemany("""
+    INSERT OR REPLACE INTO comment_analysis(analysis_tag, comment_id, model, analyzed_at, status, error)
+    VALUES (?, ?, ?, ?, 'pending', NULL)
+    """, [(analysis_tag, cid, model, now) for cid in comment_ids])
+
+def fetch_pending_ids(conn: sqlite3.Connection, *, analysis_tag: str) -> set[str]:
+    cur = conn.execute(
+        "SELECT comment_id FROM comment_analysis WHERE analysis_tag = ? AND status = 'pending'",
+        (analysis_tag,),
+    )
+    return {str(r[0]) for r in cur.fetchall()}
+
+def delete_pending_analysis(conn: sqlite3.Connection, *, analysis_tag: str) -> int:
+    cur = conn.execute(
+        "DELETE FROM comment_analysis WHERE analysis_tag = ? AND status = 'pending'",
+        (analysis_tag,),
+    )
+    return cur.rowcount or 0
+
 def save_mentions(
     conn: sqlite3.Connection,
     *,
@@ -145,15 +281,14 @@ def save_mentions(
     VALUES (?, ?, ?, ?, ?, ?)
     """, [(analysis_tag, comment_id, t, s, model, now) for (t, s) in sentiment_rows])
 
-def fetch_candidates(
-    conn: sqlite3.Connection,
+def _candidates_query(
     *,
     analysis_tag: str,
     limit: int,
     retry_errors: bool,
-    subreddits: tuple[str, ...] | None = None,
-    include_skipped: bool = False,
-) -> list[tuple[str, str]]:
+    subreddits: tuple[str, ...] | None,
+    include_skipped: bool,
+) -> tuple[str, list]:
     subreddit_filter = ""
     params: list = [analysis_tag]
 
@@ -187,8 +322,44 @@ def fetch_candidates(
         """
 
     params.append(limit)
-    cur = conn.execute(sql, params)
-    return cur.fetchall()
+    return sql, params
+
+def fetch_candidates(
+    conn: sqlite3.Connection,
+    *,
+    analysis_tag: str,
+    limit: int,
+    retry_errors: bool,
+    subreddits: tuple[str, ...] | None = None,
+    include_skipped: bool = False,
+) -> sqlite3.Cursor:
+    sql, params = _candidates_query(
+        analysis_tag=analysis_tag,
+        limit=limit,
+        retry_errors=retry_errors,
+        subreddits=subreddits,
+        include_skipped=include_skipped,
+    )
+    return conn.execute(sql, params)
+
+def count_candidates(
+    conn: sqlite3.Connection,
+    *,
+    analysis_tag: str,
+    limit: int,
+    retry_errors: bool,
+    subreddits: tuple[str, ...] | None = None,
+    include_skipped: bool = False,
+) -> int:
+    sql, params = _candidates_query(
+        analysis_tag=analysis_tag,
+        limit=limit,
+        retry_errors=retry_errors,
+        subreddits=subreddits,
+        include_skipped=include_skipped,
+    )
+    row = conn.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()
+    return int(row[0]) if row else 0
 
 def fetch_sentiment_counts(
     conn: sqlite3.Connection,
@@ -339,16 +510,28 @@ def fetch_distinct_mentioned_tickers(
         """, (analysis_tag,))
     return [r[0] for r in cur.fetchall() if r and r[0]]
 
+def fetch_ticker_validity(conn: sqlite3.Connection, *, checked_after: int) -> dict[str, bool]:
+    cur = conn.execute(
+        "SELECT ticker, valid FROM ticker_validity WHERE checked_utc > ?",
+        (int(checked_after),),
+    )
+    return {r[0]: bool(r[1]) for r in cur.fetchall() if r and r[0]}
+
+def save_ticker_validity(conn: sqlite3.Connection, *, results: Iterable[tuple[str, bool]]) -> None:
+    now = int(time.time())
+    conn.executemany("""
+    INSERT OR REPLACE INTO ticker_validity(ticker, valid, checked_utc)
+    VALUES (?, ?, ?)
+    """, [(t, 1 if v else 0, now) for (t, v) in results])
+
 def delete_mentions_for_tickers(conn: sqlite3.Connection, *, analysis_tag: str, tickers: Iterable[str]) -> int:
     ticker_list = [t for t in dict.fromkeys(tickers) if t]
     if not ticker_list:
         return 0
 
     deleted = 0
-    chunk_size = 900
-
-    for i in range(0, len(ticker_list), chunk_size):
-        chunk = ticker_list[i:i + chunk_size]
+    for i in range(0, len(ticker_list), _DELETE_CHUNK):
+        chunk = ticker_list[i:i + _DELETE_CHUNK]
         placeholders = ",".join("?" for _ in chunk)
         cur = conn.execute(
             f"DELETE FROM mentions WHERE analysis_tag = ? AND ticker IN ({placeholders})",
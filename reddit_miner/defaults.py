@@ -4,6 +4,8 @@ DEFAULT_POST_LIMIT: int = 50
 DEFAULT_MAX_COMMENTS_PER_POST: int = 500
 DEFAULT_MORE_LIMIT: int | None = 0
 DEFAULT_DB_PATH: str = "reddit_miner.db"
+DEFAULT_SCRAPE_WORKERS: int = 8
+DEFAULT_REDDIT_REQUESTS_PER_MINUTE: int = 60
 
 DEFAULT_ANALYSIS_TAG: str = "default"
 DEFAULT_ANALYSIS_LIMIT: int = 5000
@@ -12,3 +14,6 @@ DEFAULT_TOP_N: int = 25
 DEFAULT_OPENAI_MODEL: str = "gpt-5-nano"
 
 DEFAULT_MAX_REQUESTS_PER_MINUTE: int = 0
+DEFAULT_ANALYZE_CONCURRENCY: int = 8
+
+DEFAULT_TICKER_VALIDITY_TTL_DAYS: int = 7
@@ -1,18 +1,27 @@
 from __future__ import annotations
 
+import asyncio
+import io
+import json
+import signal
+import threading
 import time
 import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from typing import Iterable
 
+import httpx
 import praw
 import prawcore
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 import openai
 
 from . import db as dbmod
+from . import defaults
 from .credentials import get_secret
-from .analyzer import analyze_comment
+from .analyzer import analyze_comment_async, build_batch_request, parse_batch_result
 from . import ticker as tickermod
 
 try:
@@ -20,6 +29,10 @@ try:
 except Exception:
     ProgressBar = None
 
+PENDING_BATCH_KEY_PREFIX = "pending_batch:"
+_BATCH_MAX_REQUESTS = 50_000
+_BATCH_FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
 def _should_abort() -> bool:
     if os.name != "nt":
         return False
@@ -42,20 +55,7 @@ class AnalyzeOutcome:
     errors: int = 0
     analyzed_model_calls: int = 0
     stopped_reason: str | None = None
-
-def _now() -> float:
-    return time.monotonic()
-
-def _sleep_with_deadline(seconds: float, *, deadline: float | None) -> None:
-    if seconds <= 0:
-        return
-    if deadline is None:
-        time.sleep(seconds)
-        return
-    remaining = deadline - _now()
-    if remaining <= 0:
-        return
-    time.sleep(min(seconds, remaining))
+    detail: str | None = None
 
 def _is_quota_exhausted(err: Exception) -> bool:
     msg = (str(err) or "").lower()
@@ -101,30 +101,137 @@ def _progress(total: int, prefix: str):
 
     return pb
 
-def _build_reddit() -> praw.Reddit:
+class _Throttle:
+    def __init__(self, max_per_minute: int):
+        self.max_per_minute = max(1, int(max_per_minute))
+        self.times: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            while self.times and (now - self.times[0]) > 60:
+                self.times.popleft()
+
+            if len(self.times) >= self.max_per_minute:
+                time.sleep(max(0.0, 60 - (now - self.times[0])))
+                now = time.monotonic()
+                while self.times and (now - self.times[0]) > 60:
+                    self.times.popleft()
+
+            self.times.append(time.monotonic())
+
+class _ThrottledRequestor(prawcore.Requestor):
+    def __init__(self, *args, throttle: _Throttle, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._throttle = throttle
+
+    def request(self, *args, **kwargs):
+        self._throttle.wait()
+        return super().request(*args, **kwargs)
+
+def _build_reddit(throttle: _Throttle | None = None) -> praw.Reddit:
     cid = get_secret("REDDIT_CLIENT_ID")
     csec = get_secret("REDDIT_CLIENT_SECRET")
     ua = get_secret("REDDIT_USER_AGENT") or "reddit-miner"
     if not cid or not csec:
         raise RuntimeError("Missing Reddit credentials (client_id/client_secret). Use Setup to enter them.")
-    return praw.Reddit(client_id=cid, client_secret=csec, user_agent=ua)
+    if throttle is None:
+        return praw.Reddit(client_id=cid, client_secret=csec, user_agent=ua)
+    return praw.Reddit(
+        client_id=cid,
+        client_secret=csec,
+        user_agent=ua,
+        requestor_class=_ThrottledRequestor,
+        requestor_kwargs={"throttle": throttle},
+    )
+
+_worker_state = threading.local()
 
-def _cleanup_invalid_tickers(conn, *, analysis_tag: str) -> int:
+def _init_scrape_worker(throttle: _Throttle) -> None:
+    _worker_state.reddit = _build_reddit(throttle)
+
+def _cleanup_invalid_tickers(conn, *, analysis_tag: str, reader=None) -> int:
     if not tickermod.ENABLE_YFINANCE_VALIDATION:
         return 0
 
-    tickers = dbmod.fetch_distinct_mentioned_tickers(conn, analysis_tag=analysis_tag, subreddits=None)
+    tickers = dbmod.fetch_distinct_mentioned_tickers(reader or conn, analysis_tag=analysis_tag, subreddits=None)
     if not tickers:
         return 0
 
-    invalid = tickermod.find_invalid_tickers(tickers)
+    checked_after = int(time.time()) - defaults.DEFAULT_TICKER_VALIDITY_TTL_DAYS * 86400
+    known = dbmod.fetch_ticker_validity(reader or conn, checked_after=checked_after)
+
+    invalid = {t for t in tickers if known.get(t) is False}
+    to_check = [t for t in tickers if t not in known]
+    if to_check:
+        checked = tickermod.check_tickers(to_check)
+        if checked:
+            dbmod.begin_write(conn)
+            dbmod.save_ticker_validity(conn, results=sorted(checked.items()))
+            conn.commit()
+        invalid |= {t for t, ok in checked.items() if not ok}
+
     if not invalid:
         return 0
 
+    dbmod.begin_write(conn)
     deleted = dbmod.delete_mentions_for_tickers(conn, analysis_tag=analysis_tag, tickers=sorted(invalid))
     conn.commit()
     return deleted
 
+def _fetch_comments(
+    submission_id: str,
+    submission_title: str,
+    *,
+    subreddit: str,
+    more_limit: int | None,
+    max_comments_per_post: int,
+    bots: set[str],
+) -> list[tuple]:
+    try:
+        submission = _worker_state.reddit.submission(id=submission_id)
+        submission.comments.replace_more(limit=more_limit)
+        comments = submission.comments.list()
+    except Exception:
+        comments = []
+
+    take = comments[:max_comments_per_post] if max_comments_per_post else comments
+
+    sub = str(subreddit)
+    now = int(time.time())
+
+    rows: list[tuple] = []
+    append = rows.append
+    for c in take:
+        try:
+            author = c.author
+            author_name = str(author) if author else None
+            if author_name in bots:
+                continue
+
+            body = (c.body or "").strip()
+            if not body:
+                continue
+
+            append(
+                (
+                    str(c.id),
+                    sub,
+                    submission_id,
+                    submission_title,
+                    author_name,
+                    int(c.created_utc or 0),
+                    int(c.score or 0),
+                    body,
+                    now,
+                )
+            )
+        except Exception:
+            continue
+
+    return rows
+
 def scrape(
     conn,
     *,
@@ -134,8 +241,10 @@ def scrape(
     more_limit: int | None,
     max_comments_per_post: int,
     bot_usernames: Iterable[str],
+    workers: int = defaults.DEFAULT_SCRAPE_WORKERS,
 ) -> int:
-    reddit = _build_reddit()
+    throttle = _Throttle(defaults.DEFAULT_REDDIT_REQUESTS_PER_MINUTE)
+    reddit = _build_reddit(throttle)
     bots = set(bot_usernames or ())
 
     total_posts = max(0, int(post_limit)) * max(1, len(subreddits))
@@ -143,8 +252,40 @@ def scrape(
 
     saved = 0
     posts_done = 0
-    batch = []
-    batch_size = 200
+    batch: list[tuple] = []
+    batch_size = 500
+
+    def _flush() -> None:
+        if batch:
+            dbmod.begin_write(conn)
+            dbmod.save_comments_bulk(conn, batch)
+            batch.clear()
+        conn.commit()
+
+    def _take(fut: Future) -> None:
+        nonlocal saved, posts_done
+        pending.discard(fut)
+        rows = fut.result()
+        batch.extend(rows)
+        saved += len(rows)
+
+        if len(batch) >= batch_size:
+            _flush()
+
+        posts_done += 1
+        pb.update(posts_done)
+
+    def _drain(futures) -> None:
+        for fut in futures:
+            _abort_if_requested()
+            _take(fut)
+
+    ex = ThreadPoolExecutor(
+        max_workers=max(1, int(workers)),
+        initializer=_init_scrape_worker,
+        initargs=(throttle,),
+    )
+    pending: set[Future] = set()
 
     try:
         for sub in subreddits:
@@ -162,77 +303,238 @@ def scrape(
 
             for submission in feed:
                 _abort_if_requested()
-                try:
-                    submission.comments.replace_more(limit=more_limit)
-                    comments = submission.comments.list()
-                except Exception:
-                    comments = []
-
-                take = comments[:max_comments_per_post] if max_comments_per_post else comments
-
-                for c in take:
-                    _abort_if_requested()
-                    try:
-                        author = getattr(c, "author", None)
-                        author_name = str(author) if author else None
-                        if author_name in bots:
-                            continue
-
-                        body = (getattr(c, "body", "") or "").strip()
-                        if not body:
-                            continue
-
-                        now = int(time.time())
-                        batch.append(
-                            (
-                                str(getattr(c, "id")),
-                                str(sub),
-                                str(getattr(submission, "id", "")),
-                                str(getattr(submission, "title", "") or ""),
-                                author_name,
-                                int(getattr(c, "created_utc", 0) or 0),
-                                int(getattr(c, "score", 0) or 0),
-                                body,
-                                now,
-                            )
-                        )
-                        saved += 1
-
-                        if len(batch) >= batch_size:
-                            dbmod.save_comments_bulk(conn, batch)
-                            batch.clear()
-                            if saved % 200 == 0:
-                                conn.commit()
-                    except Exception:
-                        continue
+                pending.add(
+                    ex.submit(
+                        _fetch_comments,
+                        str(submission.id),
+                        str(getattr(submission, "title", "") or ""),
+                        subreddit=sub,
+                        more_limit=more_limit,
+                        max_comments_per_post=max_comments_per_post,
+                        bots=bots,
+                    )
+                )
 
-                posts_done += 1
-                pb.update(posts_done)
+                _drain([f for f in pending if f.done()])
 
-        if batch:
-            dbmod.save_comments_bulk(conn, batch)
-            batch.clear()
-        conn.commit()
+        _drain(as_completed(pending))
+
+        _flush()
         return saved
 
     except KeyboardInterrupt:
-        if batch:
-            dbmod.save_comments_bulk(conn, batch)
-            batch.clear()
-        conn.commit()
+        for fut in [f for f in pending if f.done() and not f.cancelled() and f.exception() is None]:
+            _take(fut)
+        _flush()
         return saved
     except (prawcore.exceptions.OAuthException, prawcore.exceptions.ResponseException, prawcore.exceptions.Forbidden):
-        if batch:
-            dbmod.save_comments_bulk(conn, batch)
-            batch.clear()
-        conn.commit()
+        _flush()
         raise
     finally:
+        ex.shutdown(wait=False, cancel_futures=True)
         try:
             pb.close()
         except Exception:
             pass
 
+async def _analyze_all(
+    writer: dbmod.BatchWriter,
+    *,
+    api_key: str,
+    candidates: Iterable[tuple[str, str]],
+    analysis_tag: str,
+    model: str,
+    concurrency: int,
+    interval: float,
+    deadline: float | None,
+    outcome: AnalyzeOutcome,
+    pb,
+) -> None:
+    concurrency = max(1, int(concurrency))
+    client = AsyncOpenAI(
+        api_key=api_key,
+        http_client=openai.DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_keepalive_connections=concurrency, max_connections=concurrency * 2),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        ),
+    )
+    sem = asyncio.BoundedSemaphore(concurrency)
+    pace_lock = asyncio.Lock()
+    mono = time.monotonic
+    has_deadline = deadline is not None
+    next_call_at = mono()
+    pending: set[asyncio.Future] = set()
+    window = concurrency * 2
+    rows_iter = iter(candidates)
+    exhausted = False
+    interrupted = False
+
+    async def _sleep(seconds: float) -> None:
+        if has_deadline:
+            seconds = min(seconds, deadline - mono())
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    async def _pace() -> None:
+        nonlocal next_call_at
+        if interval <= 0:
+            return
+        async with pace_lock:
+            now = mono()
+            if now < next_call_at:
+                await _sleep(next_call_at - now)
+            next_call_at = mono() + interval
+
+    async def _analyze_one(text: str) -> tuple[str, list[tuple[str, str]] | None, Exception | None]:
+        async with sem:
+            attempt = 0
+            while True:
+                if outcome.stopped_reason is not None or (has_deadline and mono() >= deadline):
+                    return text, None, None
+
+                try:
+                    await _pace()
+                    rows = await analyze_comment_async(client, model=model, text=text)
+                    return text, rows, None
+                except Exception as e:
+                    if _is_fatal_auth(e):
+                        raise
+
+                    quota = isinstance(e, openai.RateLimitError) and _is_quota_exhausted(e)
+                    if _is_retryable(e) and not quota:
+                        wait_s = _backoff_seconds(attempt)
+                        attempt += 1
+                        await _sleep(wait_s)
+                        continue
+
+                    return text, None, e
+
+    def _on_sigint() -> None:
+        nonlocal interrupted
+        interrupted = True
+        for t in pending:
+            t.cancel()
+
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGINT, _on_sigint)
+    except (NotImplementedError, RuntimeError, ValueError):
+        pass
+
+    done = 0
+    waiting: dict[str, list[str]] = {}
+    answered: dict[str, list[tuple[str, str]]] = {}
+
+    def _save_ok(comment_id: str, rows: list[tuple[str, str]]) -> None:
+        writer.submit(
+            dbmod.save_mentions,
+            analysis_tag=analysis_tag,
+            comment_id=comment_id,
+            model=model,
+            sentiment_rows=rows,
+        )
+        writer.submit(dbmod.mark_analyzed_ok, analysis_tag=analysis_tag, comment_id=comment_id, model=model)
+        outcome.analyzed += 1
+
+    def _fill() -> None:
+        nonlocal done, exhausted
+        while not exhausted and len(pending) < window:
+            _abort_if_requested()
+            row = next(rows_iter, None)
+            if row is None:
+                exhausted = True
+                return
+
+            comment_id, body = row
+            comment_id = str(comment_id)
+            text = (body or "").strip()
+            if not text:
+                done += 1
+                continue
+
+            if tickermod.ENABLE_KEYWORD_SHORTCUT and not tickermod.has_finance_hint(text):
+                writer.submit(dbmod.mark_analyzed_ok, analysis_tag=analysis_tag, comment_id=comment_id, model=model)
+                outcome.analyzed += 1
+                done += 1
+                continue
+
+            rows = answered.get(text)
+            if rows is not None:
+                _save_ok(comment_id, rows)
+                done += 1
+                continue
+
+            ids = waiting.get(text)
+            if ids is not None:
+                ids.append(comment_id)
+                continue
+
+            waiting[text] = [comment_id]
+            pending.add(asyncio.ensure_future(_analyze_one(text)))
+
+    try:
+        _fill()
+        pb.update(done)
+
+        while pending:
+            finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.difference_update(finished)
+
+            for fut in finished:
+                _abort_if_requested()
+                try:
+                    text, rows, err = fut.result()
+                except asyncio.CancelledError:
+                    if interrupted:
+                        outcome.stopped_reason = "ctrl_c"
+                        return
+                    raise
+
+                if rows is None and err is None:
+                    if outcome.stopped_reason is None:
+                        outcome.stopped_reason = "timeout"
+                    continue
+
+                ids = waiting.pop(text, [])
+
+                if rows is not None:
+                    outcome.analyzed_model_calls += 1
+                    answered[text] = rows
+                    for comment_id in ids:
+                        _save_ok(comment_id, rows)
+
+                else:
+                    for comment_id in ids:
+                        writer.submit(
+                            dbmod.mark_analyzed_error,
+                            analysis_tag=analysis_tag,
+                            comment_id=comment_id,
+                            model=model,
+                            error=f"{type(err).__name__}: {err}",
+                        )
+                    if isinstance(err, openai.RateLimitError) and _is_quota_exhausted(err):
+                        outcome.stopped_reason = "quota"
+                    outcome.errors += len(ids)
+
+                done += len(ids)
+
+            if outcome.stopped_reason is None:
+                _fill()
+            pb.update(done)
+
+    except KeyboardInterrupt:
+        outcome.stopped_reason = "ctrl_c"
+
+    finally:
+        try:
+            loop.remove_signal_handler(signal.SIGINT)
+        except (NotImplementedError, RuntimeError, ValueError):
+            pass
+        for t in pending:
+            t.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await client.close()
+
 def analyze(
     conn,
     *,
@@ -242,147 +544,277 @@ def analyze(
     retry_errors: bool,
     max_requests_per_minute: int,
     subreddits: tuple[str, ...] | None = None,
-    timeout_seconds: int | None = None
+    timeout_seconds: int | None = None,
+    concurrency: int = defaults.DEFAULT_ANALYZE_CONCURRENCY,
 ) -> AnalyzeOutcome:
     outcome = AnalyzeOutcome()
-    deadline = _now() + timeout_seconds if timeout_seconds else None
+    deadline = time.monotonic() + timeout_seconds if timeout_seconds else None
 
     api_key = get_secret("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("Missing OpenAI API key. Use Setup to enter it.")
 
-    client = OpenAI(api_key=api_key)
+    path = dbmod.database_path(conn)
+    reader = dbmod.open_reader(path) if path else None
+
+    try:
+        total = dbmod.count_candidates(
+            reader or conn,
+            analysis_tag=analysis_tag,
+            limit=int(limit),
+            retry_errors=bool(retry_errors),
+            subreddits=subreddits,
+        )
+        candidates = dbmod.fetch_candidates(
+            reader or conn,
+            analysis_tag=analysis_tag,
+            limit=int(limit),
+            retry_errors=bool(retry_errors),
+            subreddits=subreddits,
+        )
+    except Exception:
+        if reader is not None:
+            reader.close()
+        raise
+
+    pb = _progress(total or 1, "Analyzing comments")
+
+    interval = 60.0 / float(max_requests_per_minute) if max_requests_per_minute and max_requests_per_minute > 0 else 0.0
+
+    writer = dbmod.BatchWriter(conn)
+    try:
+        try:
+            asyncio.run(
+                _analyze_all(
+                    writer,
+                    api_key=api_key,
+                    candidates=candidates,
+                    analysis_tag=analysis_tag,
+                    model=model,
+                    concurrency=concurrency,
+                    interval=interval,
+                    deadline=deadline,
+                    outcome=outcome,
+                    pb=pb,
+                )
+            )
+        finally:
+            candidates.close()
+            writer.close()
+    except KeyboardInterrupt:
+        outcome.stopped_reason = "ctrl_c"
+    except Exception:
+        conn.commit()
+        if reader is not None:
+            reader.close()
+        raise
+    finally:
+        try:
+            pb.close()
+        except Exception:
+            pass
+
+    conn.commit()
+    try:
+        _cleanup_invalid_tickers(conn, analysis_tag=analysis_tag, reader=reader)
+    finally:
+        if reader is not None:
+            reader.close()
+    return outcome
+
+def _submit_batch(
+    conn,
+    client: OpenAI,
+    *,
+    analysis_tag: str,
+    model: str,
+    limit: int,
+    retry_errors: bool,
+    subreddits: tuple[str, ...] | None,
+    state_key: str,
+    outcome: AnalyzeOutcome,
+) -> str | None:
+    buf = io.BytesIO()
+    queued: list[str] = []
 
     candidates = dbmod.fetch_candidates(
         conn,
         analysis_tag=analysis_tag,
-        limit=int(limit),
+        limit=min(int(limit), _BATCH_MAX_REQUESTS),
         retry_errors=bool(retry_errors),
         subreddits=subreddits,
     )
-
-    pb = _progress((len(candidates) if candidates else 1), "Analyzing comments")
-
-    interval = 60.0 / float(max_requests_per_minute) if max_requests_per_minute and max_requests_per_minute > 0 else 0.0
-    next_call_at = _now()
-
-    def _pace() -> None:
-        nonlocal next_call_at
-        if interval <= 0:
-            return
-        now = _now()
-        if now < next_call_at:
-            _sleep_with_deadline(next_call_at - now, deadline=deadline)
-        next_call_at = _now() + interval
-
     try:
-        for idx, (comment_id, body) in enumerate(candidates, start=1):
+        for comment_id, body in candidates:
             _abort_if_requested()
-            if deadline is not None and _now() >= deadline:
-                outcome.stopped_reason = "timeout"
-                conn.commit()
-                _cleanup_invalid_tickers(conn, analysis_tag=analysis_tag)
-                pb.update(idx - 1)
-                return outcome
-
             text = (body or "").strip()
             if not text:
-                pb.update(idx)
                 continue
 
             if tickermod.ENABLE_KEYWORD_SHORTCUT and not tickermod.has_finance_hint(text):
+                dbmod.begin_write(conn)
                 dbmod.mark_analyzed_ok(conn, analysis_tag=analysis_tag, comment_id=str(comment_id), model=model)
                 outcome.analyzed += 1
-                if outcome.analyzed % 50 == 0:
-                    conn.commit()
-                pb.update(idx)
                 continue
 
-            attempt = 0
-            while True:
-                _abort_if_requested()
-                if deadline is not None and _now() >= deadline:
-                    outcome.stopped_reason = "timeout"
-                    conn.commit()
-                    _cleanup_invalid_tickers(conn, analysis_tag=analysis_tag)
-                    pb.update(idx - 1)
-                    return outcome
+            line = build_batch_request(str(comment_id), model=model, text=text)
+            buf.write(json.dumps(line, separators=(",", ":")).encode("utf-8"))
+            buf.write(b"\n")
+            queued.append(str(comment_id))
+    finally:
+        candidates.close()
 
-                try:
-                    _pace()
-                    rows = analyze_comment(client, model=model, text=text)
-                    outcome.analyzed_model_calls += 1
+    conn.commit()
+    if not queued:
+        return None
+
+    upload = client.files.create(file=("comments.jsonl", buf.getvalue()), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=upload.id,
+        endpoint="/v1/responses",
+        completion_window="24h",
+        metadata={"analysis_tag": analysis_tag, "model": model},
+    )
 
-                    dbmod.save_mentions(
-                        conn,
-                        analysis_tag=analysis_tag,
-                        comment_id=str(comment_id),
-                        model=model,
-                        sentiment_rows=rows,
-                    )
-                    dbmod.mark_analyzed_ok(conn, analysis_tag=analysis_tag, comment_id=str(comment_id), model=model)
-                    outcome.analyzed += 1
+    dbmod.begin_write(conn)
+    dbmod.mark_analyzed_pending(conn, analysis_tag=analysis_tag, comment_ids=queued, model=model)
+    dbmod.set_app_state(conn, key=state_key, value=batch.id)
+    return batch.id
 
-                    if outcome.analyzed % 10 == 0:
-                        conn.commit()
-                    break
+def _wait_for_batch(client: OpenAI, batch_id: str, *, poll_seconds: float, deadline: float | None):
+    pb = None
+    try:
+        while True:
+            batch = client.batches.retrieve(batch_id)
+            counts = batch.request_counts
+            if counts is not None and counts.total:
+                if pb is None:
+                    pb = _progress(counts.total, "Waiting for batch")
+                pb.update(counts.completed + counts.failed)
+
+            if batch.status in _BATCH_FINAL_STATUSES:
+                return batch
+
+            wait_until = time.monotonic() + poll_seconds
+            if deadline is not None:
+                wait_until = min(wait_until, deadline)
+            while time.monotonic() < wait_until:
+                _abort_if_requested()
+                time.sleep(min(1.0, max(0.0, wait_until - time.monotonic())))
 
-                except KeyboardInterrupt:
-                    conn.commit()
-                    outcome.stopped_reason = "ctrl_c"
-                    _cleanup_invalid_tickers(conn, analysis_tag=analysis_tag)
-                    pb.update(idx - 1)
-                    return outcome
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+    finally:
+        if pb is not None:
+            try:
+                pb.close()
+            except Exception:
+                pass
+
+def _apply_batch_results(conn, client: OpenAI, *, file_id: str, analysis_tag: str, model: str, outcome: AnalyzeOutcome) -> None:
+    content = client.files.content(file_id).text
+
+    dbmod.begin_write(conn)
+    pending = dbmod.fetch_pending_ids(conn, analysis_tag=analysis_tag)
+    for raw in content.splitlines():
+        if not raw.strip():
+            continue
+        comment_id, rows, err = parse_batch_result(json.loads(raw))
+        if comment_id not in pending:
+            continue
+
+        if rows is not None:
+            outcome.analyzed_model_calls += 1
+            dbmod.save_mentions(
+                conn,
+                analysis_tag=analysis_tag,
+                comment_id=comment_id,
+                model=model,
+                sentiment_rows=rows,
+            )
+            dbmod.mark_analyzed_ok(conn, analysis_tag=analysis_tag, comment_id=comment_id, model=model)
+            outcome.analyzed += 1
+        else:
+            dbmod.mark_analyzed_error(
+                conn,
+                analysis_tag=analysis_tag,
+                comment_id=comment_id,
+                model=model,
+                error=err or "unknown batch error",
+            )
+            outcome.errors += 1
+    conn.commit()
 
-                except Exception as e:
-                    if _is_fatal_auth(e):
-                        conn.commit()
-                        raise
+def analyze_batch(
+    conn,
+    *,
+    analysis_tag: str,
+    model: str,
+    limit: int,
+    retry_errors: bool,
+    subreddits: tuple[str, ...] | None = None,
+    timeout_seconds: int | None = None,
+    poll_seconds: float = 30.0,
+) -> AnalyzeOutcome:
+    outcome = AnalyzeOutcome()
+    deadline = time.monotonic() + timeout_seconds if timeout_seconds else None
 
-                    if isinstance(e, openai.RateLimitError) and _is_quota_exhausted(e):
-                        dbmod.mark_analyzed_error(
-                            conn,
-                            analysis_tag=analysis_tag,
-                            comment_id=str(comment_id),
-                            model=model,
-                            error=f"{type(e).__name__}: {e}",
-                        )
-                        conn.commit()
-                        outcome.stopped_reason = "quota"
-                        _cleanup_invalid_tickers(conn, analysis_tag=analysis_tag)
-                        pb.update(idx - 1)
-                        return outcome
+    api_key = get_secret("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("Missing OpenAI API key. Use Setup to enter it.")
 
-                    if _is_retryable(e):
-                        wait_s = _backoff_seconds(attempt)
-                        attempt += 1
-                        _sleep_with_deadline(wait_s, deadline=deadline)
-                        continue
+    client = OpenAI(api_key=api_key)
+    state_key = f"{PENDING_BATCH_KEY_PREFIX}{analysis_tag}"
 
-                    dbmod.mark_analyzed_error(
-                        conn,
-                        analysis_tag=analysis_tag,
-                        comment_id=str(comment_id),
-                        model=model,
-                        error=f"{type(e).__name__}: {e}",
-                    )
-                    outcome.errors += 1
-                    conn.commit()
-                    break
+    try:
+        batch_id = dbmod.get_app_state(conn, key=state_key)
+        if not batch_id:
+            batch_id = _submit_batch(
+                conn,
+                client,
+                analysis_tag=analysis_tag,
+                model=model,
+                limit=limit,
+                retry_errors=retry_errors,
+                subreddits=subreddits,
+                state_key=state_key,
+                outcome=outcome,
+            )
+            if not batch_id:
+                _cleanup_invalid_tickers(conn, analysis_tag=analysis_tag)
+                return outcome
 
-            pb.update(idx)
+        batch = _wait_for_batch(client, batch_id, poll_seconds=poll_seconds, deadline=deadline)
+        if batch is None:
+            outcome.stopped_reason = "timeout"
+            return outcome
+
+        batch_model = (batch.metadata or {}).get("model") or model
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                _apply_batch_results(
+                    conn,
+                    client,
+                    file_id=file_id,
+                    analysis_tag=analysis_tag,
+                    model=batch_model,
+                    outcome=outcome,
+                )
+
+        dbmod.begin_write(conn)
+        dbmod.delete_pending_analysis(conn, analysis_tag=analysis_tag)
+        dbmod.delete_app_state(conn, key=state_key)
+        if batch.status != "completed":
+            outcome.stopped_reason = str(batch.status)
+            if batch.errors is not None and batch.errors.data:
+                outcome.detail = "; ".join(str(e.message or e.code) for e in batch.errors.data)
 
-        conn.commit()
         _cleanup_invalid_tickers(conn, analysis_tag=analysis_tag)
         return outcome
 
     except KeyboardInterrupt:
         conn.commit()
         outcome.stopped_reason = "ctrl_c"
-        _cleanup_invalid_tickers(conn, analysis_tag=analysis_tag)
         return outcome
     finally:
-        try:
-            pb.close()
-        except Exception:
-            pass
+        client.close()
@@ -1,13 +1,16 @@
 import sys
 import time
 
+_REDRAW_NS = 100_000_000
+
 class ProgressBar:
     def __init__(self, total: int, prefix: str = "", width: int = 30):
         self.total = max(1, int(total))
         self.prefix = prefix
         self.width = max(5, int(width))
-        self.start = time.time()
-        self.last_draw = 0.0
+        self.start = time.monotonic_ns()
+        self.last_draw = 0
+        self._last_filled = -1
         self._use_rich = False
         self._stopped = False
 
@@ -37,14 +40,13 @@ class ProgressBar:
             self._stopped = True
 
     def update(self, current: int) -> None:
-        now = time.time()
+        now = time.monotonic_ns()
 
-        if now - self.last_draw < 0.1 and current < self.total:
+        if now - self.last_draw < _REDRAW_NS and current < self.total:
             return
         self.last_draw = now
 
         cur = max(0, min(int(current), self.total))
-        frac = cur / self.total
 
         if self._use_rich:
             self._progress.update(self._task_id, completed=cur)
@@ -52,11 +54,15 @@ class ProgressBar:
                 self._stop_rich()
             return
 
-        filled = int(self.width * frac)
+        filled = self.width * cur // self.total
+        if filled == self._last_filled and cur < self.total:
+            return
+        self._last_filled = filled
+
         bar = "=" * filled + "." * (self.width - filled)
-        elapsed = int(now - self.start)
+        elapsed = (now - self.start) // 1_000_000_000
 
-        msg = f"\r{self.prefix} [{bar}] {cur}/{self.total} ({frac * 100:5.1f}%)  {elapsed}s"
+        msg = f"\r{self.prefix} [{bar}] {cur}/{self.total} ({cur * 100 / self.total:5.1f}%)  {elapsed}s"
         sys.stdout.write(msg)
         sys.stdout.flush()
 
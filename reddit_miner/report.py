@@ -3,6 +3,7 @@ from __future__ import annotations
 import os
 import sys
 import shutil
+from dataclasses import dataclass
 from typing import Any, Iterable, Sequence
 
 def _ask_top_n(*, default: int, max_n: int) -> int:
@@ -28,27 +29,40 @@ def _ask_top_n(*, default: int, max_n: int) -> int:
 
         print("Please enter a positive number, press Enter, or type 'all'.")
 
-def _summary_lines(summary: dict[str, Any]) -> list[str]:
-    keys_order = [
-        "db_path",
-        "subreddits",
-        "listing",
-        "post_limit",
-        "max_comments_per_post",
-        "analysis_tag",
-        "model",
-        "saved",
-        "analyzed_model_calls",
-    ]
+@dataclass(slots=True)
+class RunSummary:
+    db_path: str
+    subreddits: tuple[str, ...]
+    listing: str
+    analysis_tag: str
+    model: str
+    post_limit: int | str | None = None
+    max_comments_per_post: int | str | None = None
+    saved: int | str | None = None
+    analyzed_model_calls: int | str | None = None
+
+_SUMMARY_ORDER: tuple[str, ...] = (
+    "db_path",
+    "subreddits",
+    "listing",
+    "post_limit",
+    "max_comments_per_post",
+    "analysis_tag",
+    "model",
+    "saved",
+    "analyzed_model_calls",
+)
+
+def _summary_lines(summary: RunSummary) -> list[str]:
     lines: list[str] = []
-    for k in keys_order:
-        if k in summary:
-            lines.append(f"{k}: {summary.get(k)}")
-    for k, v in summary.items():
-        if k not in keys_order:
+    for k in _SUMMARY_ORDER:
+        v = getattr(summary, k)
+        if v is not None:
             lines.append(f"{k}: {v}")
     return lines or ["No summary."]
 
+_ROW_FORMAT = "{:<10} {:>6} {:>6} {:>6} {:>6} {:>6}"
+
 def _coerce_int(x: Any) -> int:
     try:
         return int(x)
@@ -154,7 +168,7 @@ def _pager(lines: list[str]) -> None:
 
 def print_report_rich(
     *,
-    summary: dict[str, Any],
+    summary: RunSummary,
     rows: Iterable[Sequence[Any]],
     top_n: int = 20,
     prompt_for_top_n: bool = True,
@@ -179,12 +193,11 @@ def print_report_rich(
         _pager(lines)
         return
 
-    header = f"{'Ticker':<10} {'Bull':>6} {'Bear':>6} {'Neut':>6} {'Ment':>6} {'Score':>6}"
+    header = _ROW_FORMAT.format("Ticker", "Bull", "Bear", "Neut", "Ment", "Score")
     lines.append(header)
     lines.append("-" * len(header))
-    for r in display_rows:
-        t, b, be, n, m, s = _normalize_row(r)
-        lines.append(f"{t:<10} {b:>6} {be:>6} {n:>6} {m:>6} {s:>6}")
+    row_format = _ROW_FORMAT.format
+    lines.extend([row_format(*_normalize_row(r)) for r in display_rows])
 
     if max_available and len(display_rows) < max_available:
         lines.append("")
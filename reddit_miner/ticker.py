@@ -1,11 +1,16 @@
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 
 import yfinance as yf
+from yfinance.exceptions import YFRateLimitError
 
 ENABLE_KEYWORD_SHORTCUT = False
 ENABLE_YFINANCE_VALIDATION = False
 
+_YF_MAX_WORKERS = 4
+
 _HINT_WORDS_RAW: list[str] = [
     "buy", "buys", "buying", "bought",
     "accumulate", "accumulating", "accumulated", "add",
@@ -52,36 +57,36 @@ _HINT_WORDS_RAW: list[str] = [
     "lose", "loses", "losing", "lost",
 ]
 
-def _compile_hints(words: list[str]) -> re.Pattern:
-    cleaned: list[str] = []
-    seen: set[str] = set()
+_WORD_RE = re.compile(r"\w+")
+
+def _compile_hints(words: list[str]) -> tuple[frozenset[str], re.Pattern | None]:
+    single: set[str] = set()
+    phrases: list[str] = []
 
     for w in words:
         w = (w or "").strip().lower()
-        if not w or w in seen:
+        if not w:
             continue
-        seen.add(w)
-        cleaned.append(w)
-
-    cleaned.sort(key=len, reverse=True)
-
-    patterns: list[str] = []
-    for w in cleaned:
         if "-" in w:
             parts = [re.escape(p) for p in w.split("-") if p]
-            if len(parts) >= 2:
-                patterns.append(r"[-\s]?".join(parts))
-            else:
-                patterns.append(re.escape(w))
-        else:
-            patterns.append(re.escape(w))
+            phrases.append(r"[-\s]?".join(parts) if len(parts) >= 2 else re.escape(w))
+            continue
+        single.add(w)
 
-    return re.compile(r"(?i)\b(" + "|".join(patterns) + r")\b")
+    if not phrases:
+        return frozenset(single), None
 
-_FINANCE_HINTS = _compile_hints(_HINT_WORDS_RAW)
+    phrases.sort(key=len, reverse=True)
+    return frozenset(single), re.compile(r"(?i)\b(" + "|".join(phrases) + r")\b")
+
+_FINANCE_WORDS, _FINANCE_PHRASES = _compile_hints(_HINT_WORDS_RAW)
 
 def has_finance_hint(text: str) -> bool:
-    return bool(text) and bool(_FINANCE_HINTS.search(text))
+    if not text:
+        return False
+    if not _FINANCE_WORDS.isdisjoint(_WORD_RE.findall(text.lower())):
+        return True
+    return _FINANCE_PHRASES is not None and bool(_FINANCE_PHRASES.search(text))
 
 @lru_cache(maxsize=8192)
 def normalize_ticker(sym: str) -> str:
@@ -103,24 +108,32 @@ def normalize_ticker(sym: str) -> str:
     return sym
 
 @lru_cache(maxsize=4096)
-def is_real_ticker_yf(t: str) -> bool:
-    try:
-        info = yf.Ticker(t).info
-        return bool(info)
-    except Exception:
-        return False
+def _lookup_ticker_yf(t: str) -> bool:
+    return bool(yf.Ticker(t).info)
 
-def find_invalid_tickers(tickers: list[str]) -> set[str]:
+def check_tickers(tickers: list[str]) -> dict[str, bool]:
     if not ENABLE_YFINANCE_VALIDATION:
-        return set()
-
-    invalid: set[str] = set()
-    seen: set[str] = set()
-    for t in tickers:
-        tt = normalize_ticker(t)
-        if not tt or tt in seen:
-            continue
-        seen.add(tt)
-        if not is_real_ticker_yf(tt):
-            invalid.add(tt)
-    return invalid
+        return {}
+
+    unique = [t for t in dict.fromkeys(normalize_ticker(t) for t in tickers) if t]
+    if not unique:
+        return {}
+
+    throttled = threading.Event()
+
+    def _check(t: str) -> bool | None:
+        if throttled.is_set():
+            return None
+        try:
+            return _lookup_ticker_yf(t)
+        except YFRateLimitError:
+            throttled.set()
+            return None
+        except Exception:
+            return None
+
+    workers = max(1, min(_YF_MAX_WORKERS, len(unique)))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        results = list(ex.map(_check, unique))
+
+    return {t: ok for t, ok in zip(unique, results) if ok is not None}